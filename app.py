@@ -1,49 +1,139 @@
 import os
+import queue
 import sqlite3
-from flask import Flask, request, jsonify, g
+import threading
+from flask import Flask, request, g
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
+from passlib.context import CryptContext
+from gevent import monkey
+from gevent.threadpool import ThreadPool
 import jwt
-from functools import wraps
-from datetime import datetime, timedelta
+import orjson
+from functools import lru_cache, wraps
+from datetime import datetime, timezone
+from cachetools import TTLCache
+import hashlib
+import time
 import re
 import click
 
 # Configuration de l'application
 app = Flask(__name__)
-CORS(app)  # Permet les requêtes cross-origin
+# CORS limité à l'API ; max_age permet aux navigateurs de mettre en cache les requêtes preflight
+CORS(app, resources={r"/api/*": {
+    "origins": [o.strip() for o in os.environ.get('CORS_ORIGINS', '*').split(',') if o.strip()],
+    "max_age": 86400
+}})
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev')
 app.config['DATABASE'] = os.environ.get('DATABASE', 'ventes.db')
 
+# Durée de validité des tokens JWT, en secondes
+TOKEN_LIFETIME = 3600
+
 # Limiter pour prévenir les attaques par force brute
+# Les compteurs sont partagés entre workers via Redis (RATELIMIT_STORAGE) ;
+# sans configuration, ils restent en mémoire pour le développement.
 limiter = Limiter(
     key_func=get_remote_address,
     app=app,
-    default_limits=["200 per day", "50 per hour"]
+    default_limits=["200 per day", "50 per hour"],
+    storage_uri=os.environ.get('RATELIMIT_STORAGE', 'memory://'),
+    strategy="moving-window"
 )
 
+# Pagination de la liste des ventes
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Nombre maximum de ventes par insertion groupée
+MAX_BULK_SIZE = 1000
+
+# Format autorisé pour les noms d'utilisateur (\Z évite d'accepter un saut de ligne final)
+USERNAME_RE = re.compile(r'^[a-zA-Z0-9_]{3,20}\Z')
+
+# Hachage des mots de passe avec bcrypt ; BCRYPT_ROUNDS permet de réduire le coût en dev/test.
+# bcrypt ignore tout ce qui dépasse 72 octets : on refuse ces mots de passe
+# plutôt que de les tronquer silencieusement (à l'inscription comme à la connexion).
+MAX_PASSWORD_BYTES = 72
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    bcrypt__rounds=int(os.environ.get('BCRYPT_ROUNDS', 12)),
+    bcrypt__truncate_error=True
+)
+
+# Sous gunicorn -k gevent, le hachage (C, non patchable) bloquerait toute la
+# boucle d'événements : il est alors exécuté dans un pool de threads.
+_HASH_POOL = ThreadPool(4) if monkey.is_module_patched('threading') else None
+
+# Cache des tokens déjà validés : empreinte SHA-256 du token -> (exp, utilisateur)
+# Évite de refaire jwt.decode à chaque appel authentifié.
+_token_cache = TTLCache(maxsize=10000, ttl=30)
+
+# Cache court des tokens rejetés (empreinte -> message d'erreur), pour absorber
+# les rejeux massifs d'un même token invalide.
+_bad_token_cache = TTLCache(maxsize=10000, ttl=5)
+
+# TTLCache n'est pas thread-safe (serveur threadé de `flask run`) : les accès
+# aux deux caches sont protégés par un verrou.
+_token_cache_lock = threading.Lock()
+
+# Réponses JSON sérialisées avec orjson, plus rapide que le json de la stdlib
+def ojson(obj, status=200):
+    """Construit une réponse JSON avec orjson."""
+    return app.response_class(orjson.dumps(obj), status=status, mimetype='application/json')
+
 # Fonctions pour la base de données
+# Petit pool de connexions partagé : chaque requête emprunte une connexion et la
+# rend à la fin du contexte applicatif. Une connexion n'est jamais utilisée par
+# deux requêtes à la fois, d'où check_same_thread=False (serveur threadé de
+# `flask run`). Sous gevent, queue est patché et tout tourne dans un seul thread.
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+_db_pool = queue.Queue(maxsize=DB_POOL_SIZE)
+
+def _connect():
+    """Ouvre une nouvelle connexion SQLite configurée."""
+    db = sqlite3.connect(app.config['DATABASE'], check_same_thread=False)
+    db.row_factory = sqlite3.Row
+    # journal_mode=WAL est enregistré dans le fichier par init_db ;
+    # les réglages suivants sont propres à chaque connexion.
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute("PRAGMA cache_size=-20000")
+    db.execute("PRAGMA temp_store=MEMORY")
+    return db
+
 def get_db():
-    """Connexion à la base de données."""
+    """Connexion à la base de données, empruntée au pool pour la durée de la requête."""
     db = getattr(g, '_database', None)
     if db is None:
-        db = g._database = sqlite3.connect(app.config['DATABASE'])
-        db.row_factory = sqlite3.Row
+        try:
+            db = _db_pool.get_nowait()
+        except queue.Empty:
+            db = _connect()
+        g._database = db
     return db
 
 @app.teardown_appcontext
 def close_connection(exception):
-    """Fermeture de la connexion à la base de données."""
-    db = getattr(g, '_database', None)
-    if db is not None:
+    """Rend la connexion au pool, après annulation de toute transaction restée ouverte."""
+    db = g.pop('_database', None)
+    if db is None:
+        return
+    if db.in_transaction:
+        db.rollback()
+    try:
+        _db_pool.put_nowait(db)
+    except queue.Full:
         db.close()
 
 def init_db():
     """Initialisation de la base de données."""
     with app.app_context():
         db = get_db()
+        # Le mode WAL est persistant : il suffit de l'activer une fois sur le fichier
+        db.execute("PRAGMA journal_mode=WAL")
         # Création des tables directement dans le code
         db.executescript('''
             CREATE TABLE IF NOT EXISTS users (
@@ -61,6 +151,28 @@ def init_db():
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             );
+            
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_ventes_design ON ventes(design);
+            
+            -- Compteur de version des ventes, incrémenté à chaque écriture (ETag de la liste)
+            CREATE TABLE IF NOT EXISTS ventes_version (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                version INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO ventes_version (id, version) VALUES (1, 0);
+            
+            CREATE TRIGGER IF NOT EXISTS ventes_version_insert AFTER INSERT ON ventes
+            BEGIN
+                UPDATE ventes_version SET version = version + 1 WHERE id = 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS ventes_version_update AFTER UPDATE ON ventes
+            BEGIN
+                UPDATE ventes_version SET version = version + 1 WHERE id = 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS ventes_version_delete AFTER DELETE ON ventes
+            BEGIN
+                UPDATE ventes_version SET version = version + 1 WHERE id = 1;
+            END;
         ''')
         db.commit()
 
@@ -79,10 +191,35 @@ def query_db(query, args=(), one=False):
     return (rv[0] if rv else None) if one else rv
 
 def execute_db(query, args=()):
-    """Exécute une requête SQL sans récupérer de résultats."""
+    """Exécute une requête SQL sans récupérer de résultats et renvoie le nombre de lignes affectées."""
     db = get_db()
-    db.execute(query, args)
+    cur = db.execute(query, args)
     db.commit()
+    return cur.rowcount
+
+# Fonctions pour les mots de passe
+def hash_password(password):
+    """Hache un mot de passe avec bcrypt."""
+    return pwd_context.hash(password)
+
+def verify_password(hashed_password, password):
+    """Vérifie un mot de passe, y compris les anciens hachages pbkdf2 de Werkzeug."""
+    if hashed_password.startswith('pbkdf2:'):
+        return check_password_hash(hashed_password, password)
+    # passlib ne vérifie la limite de 72 octets qu'au hachage : sans ce contrôle,
+    # un mot de passe de 72 octets suivi de n'importe quel suffixe serait accepté.
+    if len(password.encode()) > MAX_PASSWORD_BYTES:
+        return False
+    try:
+        return pwd_context.verify(password, hashed_password)
+    except ValueError:
+        return False
+
+def run_hashing(func, *args):
+    """Exécute une opération de hachage hors de la boucle gevent si elle est active."""
+    if _HASH_POOL is None:
+        return func(*args)
+    return _HASH_POOL.apply(func, args)
 
 # Fonction de validation
 def validate_vente(design, prix, quantite):
@@ -92,19 +229,27 @@ def validate_vente(design, prix, quantite):
     if not design or not isinstance(design, str) or len(design) > 100:
         errors.append("La désignation doit être une chaîne non vide de maximum 100 caractères.")
     
-    try:
-        prix_float = float(prix)
-        if prix_float <= 0:
-            errors.append("Le prix doit être positif.")
-    except (ValueError, TypeError):
+    # Le JSON fournit déjà des int/float : la conversion (et son try/except)
+    # n'est nécessaire que pour les chaînes.
+    if type(prix) is str:
+        try:
+            prix = float(prix)
+        except ValueError:
+            prix = None
+    if type(prix) not in (int, float):
         errors.append("Le prix doit être un nombre.")
+    elif prix <= 0:
+        errors.append("Le prix doit être positif.")
     
-    try:
-        quantite_int = int(quantite)
-        if quantite_int <= 0:
-            errors.append("La quantité doit être un entier positif.")
-    except (ValueError, TypeError):
+    if type(quantite) is str:
+        try:
+            quantite = int(quantite)
+        except ValueError:
+            quantite = None
+    if type(quantite) is not int:
         errors.append("La quantité doit être un entier.")
+    elif quantite <= 0:
+        errors.append("La quantité doit être un entier positif.")
     
     return errors
 
@@ -115,19 +260,48 @@ def token_required(f):
     def decorated(*args, **kwargs):
         token = None
         
-        if 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            if auth_header.startswith('Bearer '):
-                token = auth_header.split(' ')[1]
+        auth_header = request.headers.get('Authorization', '')
+        if auth_header.startswith('Bearer '):
+            token = auth_header[7:]
         
         if not token:
-            return jsonify({'message': 'Token manquant!'}), 401
+            return ojson({'message': 'Token manquant!'}, 401)
+        
+        h = hashlib.sha256(token.encode()).digest()
+        with _token_cache_lock:
+            cached = _token_cache.get(h)
+            rejected = _bad_token_cache.get(h)
+        
+        # Un token expiré ne doit jamais être servi depuis le cache
+        if cached is not None and cached[0] > time.time():
+            return f(cached[1], *args, **kwargs)
         
+        # Token récemment rejeté : on répond sans refaire la vérification
+        if rejected is not None:
+            return ojson({'message': rejected}, 401)
+        
+        # La signature HS256 suffit : l'utilisateur est reconstruit à partir des
+        # claims du token, sans requête SQL. La courte durée de vie du token
+        # borne le délai de prise en compte d'un changement de rôle.
         try:
             data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
-            current_user = query_db('SELECT * FROM users WHERE id = ?', (data['user_id'],), one=True)
-        except:
-            return jsonify({'message': 'Token invalide!'}), 401
+            exp = data['exp']
+            current_user = {'id': data['user_id'], 'username': data['username'], 'role': data['role']}
+        except jwt.ExpiredSignatureError:
+            message = 'Token expiré!'
+        except (jwt.InvalidTokenError, KeyError):
+            message = 'Token invalide!'
+        else:
+            message = None
+        
+        with _token_cache_lock:
+            if message is None:
+                _token_cache[h] = (exp, current_user)
+            else:
+                _bad_token_cache[h] = message
+        
+        if message is not None:
+            return ojson({'message': message}, 401)
         
         return f(current_user, *args, **kwargs)
     
@@ -141,32 +315,32 @@ def register():
     data = request.get_json()
     
     if not data or not data.get('username') or not data.get('password'):
-        return jsonify({'message': 'Données incomplètes!'}), 400
+        return ojson({'message': 'Données incomplètes!'}, 400)
     
     username = data['username']
     password = data['password']
     
     # Validation du nom d'utilisateur
-    if not re.match(r'^[a-zA-Z0-9_]{3,20}$', username):
-        return jsonify({'message': 'Le nom d\'utilisateur doit contenir entre 3 et 20 caractères alphanumériques ou _'}), 400
+    if not USERNAME_RE.match(username):
+        return ojson({'message': 'Le nom d\'utilisateur doit contenir entre 3 et 20 caractères alphanumériques ou _'}, 400)
     
     # Validation du mot de passe
     if len(password) < 8:
-        return jsonify({'message': 'Le mot de passe doit contenir au moins 8 caractères'}), 400
-    
-    # Vérifier si l'utilisateur existe déjà
-    user = query_db('SELECT * FROM users WHERE username = ?', (username,), one=True)
-    if user:
-        return jsonify({'message': 'Utilisateur déjà existant!'}), 409
+        return ojson({'message': 'Le mot de passe doit contenir au moins 8 caractères'}, 400)
+    if len(password.encode()) > MAX_PASSWORD_BYTES:
+        return ojson({'message': f'Le mot de passe ne doit pas dépasser {MAX_PASSWORD_BYTES} octets'}, 400)
     
     # Hasher le mot de passe
-    hashed_password = generate_password_hash(password)
+    hashed_password = run_hashing(hash_password, password)
     
-    # Insérer l'utilisateur
-    execute_db('INSERT INTO users (username, password, role) VALUES (?, ?, ?)',
-              (username, hashed_password, 'user'))
+    # Insérer l'utilisateur, sauf s'il existe déjà
+    inserted = execute_db('INSERT INTO users (username, password, role) VALUES (?, ?, ?) '
+                          'ON CONFLICT(username) DO NOTHING',
+                          (username, hashed_password, 'user'))
+    if not inserted:
+        return ojson({'message': 'Utilisateur déjà existant!'}, 409)
     
-    return jsonify({'message': 'Utilisateur créé avec succès!'}), 201
+    return ojson({'message': 'Utilisateur créé avec succès!'}, 201)
 
 @app.route('/api/login', methods=['POST'])
 @limiter.limit("10 per minute")
@@ -177,66 +351,96 @@ def login():
     if not auth or not auth.username or not auth.password:
         data = request.get_json()
         if not data or not data.get('username') or not data.get('password'):
-            return jsonify({'message': 'Authentification requise!'}), 401
+            return ojson({'message': 'Authentification requise!'}, 401)
         username = data['username']
         password = data['password']
     else:
         username = auth.username
         password = auth.password
     
-    user = query_db('SELECT * FROM users WHERE username = ?', (username,), one=True)
+    user = query_db('SELECT id, username, role, password FROM users WHERE username = ?', (username,), one=True)
     
-    if not user or not check_password_hash(user['password'], password):
-        return jsonify({'message': 'Identifiants incorrects!'}), 401
+    if not user or not run_hashing(verify_password, user['password'], password):
+        return ojson({'message': 'Identifiants incorrects!'}, 401)
     
     # Générer un token JWT
     token = jwt.encode({
         'user_id': user['id'],
-        'exp': datetime.utcnow() + timedelta(hours=24)
+        'username': user['username'],
+        'role': user['role'],
+        'exp': int(time.time()) + TOKEN_LIFETIME
     }, app.config['SECRET_KEY'], algorithm="HS256")
     
-    return jsonify({'token': token})
+    return ojson({'token': token})
 
 # Routes pour les ventes
 @app.route('/api/ventes', methods=['GET'])
 @token_required
 def get_all_ventes(current_user):
-    """Récupérer toutes les ventes."""
-    ventes = query_db('SELECT * FROM ventes')
-    
-    output = []
-    for vente in ventes:
-        vente_data = {
-            'numProduit': vente['numProduit'],
-            'design': vente['design'],
-            'prix': vente['prix'],
-            'quantite': vente['quantite'],
-            'created_at': vente['created_at'],
-            'updated_at': vente['updated_at']
-        }
-        output.append(vente_data)
-    
-    return jsonify({'ventes': output})
+    """Récupérer les ventes, paginées et éventuellement filtrées."""
+    try:
+        limit = min(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+        offset = int(request.args.get('offset', 0))
+        after = request.args.get('after')
+        after = int(after) if after is not None else None
+        # updated_at est stocké en UTC au format de CURRENT_TIMESTAMP : la date
+        # fournie est normalisée dans ce format pour que la comparaison de
+        # chaînes soit correcte (ISO 8601 avec 'T', date seule, fuseau horaire).
+        since = request.args.get('since')
+        if since:
+            since_dt = datetime.fromisoformat(since)
+            if since_dt.tzinfo is not None:
+                since_dt = since_dt.astimezone(timezone.utc).replace(tzinfo=None)
+            since = since_dt.strftime('%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        return ojson({'message': 'Paramètres de pagination invalides!'}, 400)
+    
+    if limit <= 0 or offset < 0:
+        return ojson({'message': 'Paramètres de pagination invalides!'}, 400)
+    
+    conditions = []
+    args = []
+    
+    # Pagination par clé (numProduit > after), plus efficace que OFFSET en profondeur
+    if after is not None:
+        conditions.append('numProduit > ?')
+        args.append(after)
+    
+    # Ventes modifiées depuis une date donnée
+    if since:
+        conditions.append('updated_at > ?')
+        args.append(since)
+    
+    # ETag calculé à partir du compteur de version (incrémenté par trigger à chaque
+    # écriture) et des paramètres de la requête : un client qui interroge en boucle
+    # reçoit 304 tant que rien n'a changé, pour le prix d'une lecture par clé.
+    version = query_db('SELECT version FROM ventes_version WHERE id = 1', one=True)
+    etag = hashlib.md5(f"{version['version']}-{request.query_string.decode()}".encode()).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+    
+    where = ' WHERE ' + ' AND '.join(conditions) if conditions else ''
+    ventes = query_db('SELECT numProduit, design, prix, quantite, created_at, updated_at FROM ventes'
+                      + where + ' ORDER BY numProduit LIMIT ? OFFSET ?',
+                      args + [limit, offset])
+    
+    response = ojson({'ventes': [dict(vente) for vente in ventes]})
+    response.set_etag(etag)
+    return response
 
 @app.route('/api/ventes/<int:num_produit>', methods=['GET'])
 @token_required
 def get_one_vente(current_user, num_produit):
     """Récupérer une vente par son numéro."""
-    vente = query_db('SELECT * FROM ventes WHERE numProduit = ?', (num_produit,), one=True)
+    vente = query_db('SELECT numProduit, design, prix, quantite, created_at, updated_at '
+                     'FROM ventes WHERE numProduit = ?', (num_produit,), one=True)
     
     if not vente:
-        return jsonify({'message': 'Vente non trouvée!'}), 404
-    
-    vente_data = {
-        'numProduit': vente['numProduit'],
-        'design': vente['design'],
-        'prix': vente['prix'],
-        'quantite': vente['quantite'],
-        'created_at': vente['created_at'],
-        'updated_at': vente['updated_at']
-    }
+        return ojson({'message': 'Vente non trouvée!'}, 404)
     
-    return jsonify({'vente': vente_data})
+    return ojson({'vente': dict(vente)})
 
 @app.route('/api/ventes', methods=['POST'])
 @token_required
@@ -245,7 +449,7 @@ def create_vente(current_user):
     data = request.get_json()
     
     if not data:
-        return jsonify({'message': 'Aucune donnée fournie!'}), 400
+        return ojson({'message': 'Aucune donnée fournie!'}, 400)
     
     design = data.get('design')
     prix = data.get('prix')
@@ -253,17 +457,59 @@ def create_vente(current_user):
     
     errors = validate_vente(design, prix, quantite)
     if errors:
-        return jsonify({'message': 'Données invalides', 'errors': errors}), 400
+        return ojson({'message': 'Données invalides', 'errors': errors}, 400)
     
-    # Vérifier si l'article existe déjà
-    existing_vente = query_db('SELECT * FROM ventes WHERE design = ?', (design,), one=True)
-    if existing_vente:
-        return jsonify({'message': 'Un article avec cette désignation existe déjà!'}), 409
+    # Insérer l'article, sauf si la désignation existe déjà
+    inserted = execute_db('INSERT INTO ventes (design, prix, quantite) VALUES (?, ?, ?) '
+                          'ON CONFLICT(design) DO NOTHING',
+                          (design, prix, quantite))
+    if not inserted:
+        return ojson({'message': 'Un article avec cette désignation existe déjà!'}, 409)
     
-    execute_db('INSERT INTO ventes (design, prix, quantite) VALUES (?, ?, ?)',
-              (design, prix, quantite))
+    return ojson({'message': 'Vente créée avec succès!'}, 201)
+
+@app.route('/api/ventes/bulk', methods=['POST'])
+@token_required
+def create_ventes_bulk(current_user):
+    """Créer plusieurs ventes en une seule transaction."""
+    data = request.get_json()
+    
+    if not data or not isinstance(data, list):
+        return ojson({'message': 'Une liste de ventes est attendue!'}, 400)
+    
+    if len(data) > MAX_BULK_SIZE:
+        return ojson({'message': f'Au maximum {MAX_BULK_SIZE} ventes par requête!'}, 400)
+    
+    # Toutes les ventes sont validées avant la moindre insertion
+    errors = {}
+    rows = []
+    for index, vente in enumerate(data):
+        if not isinstance(vente, dict):
+            errors[str(index)] = ["Chaque vente doit être un objet."]
+            continue
+        design = vente.get('design')
+        prix = vente.get('prix')
+        quantite = vente.get('quantite')
+        vente_errors = validate_vente(design, prix, quantite)
+        if vente_errors:
+            errors[str(index)] = vente_errors
+        else:
+            rows.append((design, prix, quantite))
+    
+    if errors:
+        return ojson({'message': 'Données invalides', 'errors': errors}, 400)
     
-    return jsonify({'message': 'Vente créée avec succès!'}), 201
+    # Les désignations déjà existantes sont ignorées
+    db = get_db()
+    with db:
+        cur = db.executemany('INSERT INTO ventes (design, prix, quantite) VALUES (?, ?, ?) '
+                             'ON CONFLICT(design) DO NOTHING', rows)
+    
+    return ojson({
+        'message': 'Ventes créées avec succès!',
+        'inserted': cur.rowcount,
+        'skipped': len(rows) - cur.rowcount
+    }, 201)
 
 @app.route('/api/ventes/<int:num_produit>', methods=['PUT'])
 @token_required
@@ -272,12 +518,12 @@ def update_vente(current_user, num_produit):
     data = request.get_json()
     
     if not data:
-        return jsonify({'message': 'Aucune donnée fournie!'}), 400
+        return ojson({'message': 'Aucune donnée fournie!'}, 400)
     
-    vente = query_db('SELECT * FROM ventes WHERE numProduit = ?', (num_produit,), one=True)
+    vente = query_db('SELECT design, prix, quantite FROM ventes WHERE numProduit = ?', (num_produit,), one=True)
     
     if not vente:
-        return jsonify({'message': 'Vente non trouvée!'}), 404
+        return ojson({'message': 'Vente non trouvée!'}, 404)
     
     design = data.get('design', vente['design'])
     prix = data.get('prix', vente['prix'])
@@ -285,48 +531,60 @@ def update_vente(current_user, num_produit):
     
     errors = validate_vente(design, prix, quantite)
     if errors:
-        return jsonify({'message': 'Données invalides', 'errors': errors}), 400
-    
-    execute_db('''
-    UPDATE ventes 
-    SET design = ?, prix = ?, quantite = ?, updated_at = CURRENT_TIMESTAMP 
-    WHERE numProduit = ?
-    ''', (design, prix, quantite, num_produit))
+        return ojson({'message': 'Données invalides', 'errors': errors}, 400)
     
-    return jsonify({'message': 'Vente mise à jour avec succès!'})
+    try:
+        execute_db('''
+        UPDATE ventes 
+        SET design = ?, prix = ?, quantite = ?, updated_at = CURRENT_TIMESTAMP 
+        WHERE numProduit = ?
+        ''', (design, prix, quantite, num_produit))
+    except sqlite3.IntegrityError:
+        # Désignation déjà utilisée par un autre article (index unique)
+        return ojson({'message': 'Un article avec cette désignation existe déjà!'}, 409)
+    
+    return ojson({'message': 'Vente mise à jour avec succès!'})
 
 @app.route('/api/ventes/<int:num_produit>', methods=['DELETE'])
 @token_required
 def delete_vente(current_user, num_produit):
     """Supprimer une vente."""
-    vente = query_db('SELECT * FROM ventes WHERE numProduit = ?', (num_produit,), one=True)
+    vente = query_db('SELECT 1 FROM ventes WHERE numProduit = ?', (num_produit,), one=True)
     
     if not vente:
-        return jsonify({'message': 'Vente non trouvée!'}), 404
+        return ojson({'message': 'Vente non trouvée!'}, 404)
     
     execute_db('DELETE FROM ventes WHERE numProduit = ?', (num_produit,))
     
-    return jsonify({'message': 'Vente supprimée avec succès!'})
+    return ojson({'message': 'Vente supprimée avec succès!'})
+
+# Les lectures de ventes sont propres à l'utilisateur : cache privé, revalidé via l'ETag
+@app.after_request
+def set_cache_control(response):
+    if (request.method == 'GET' and request.path.startswith('/api/ventes')
+            and response.status_code in (200, 304) and 'Cache-Control' not in response.headers):
+        response.headers['Cache-Control'] = 'private, no-cache'
+    return response
 
 # Gestion des erreurs
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({'message': 'Ressource non trouvée!'}), 404
+    return ojson({'message': 'Ressource non trouvée!'}, 404)
 
 @app.errorhandler(405)
 def method_not_allowed(error):
-    return jsonify({'message': 'Méthode non autorisée!'}), 405
+    return ojson({'message': 'Méthode non autorisée!'}, 405)
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({'message': 'Erreur interne du serveur!'}), 500
+    return ojson({'message': 'Erreur interne du serveur!'}, 500)
 
 # Route de santé
+@lru_cache(maxsize=1)
+def _iso_timestamp(second):
+    """Horodatage ISO 8601, recalculé au plus une fois par seconde."""
+    return datetime.fromtimestamp(second).isoformat()
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    return jsonify({'status': 'ok', 'timestamp': datetime.now().isoformat()})
-
-if __name__ == '__main__':
-    # Utiliser un environnement de production avec waitress ou gunicorn
-    # Pour le développement:
-    app.run(debug=False, host='0.0.0.0', port=5000)
+    return ojson({'status': 'ok', 'timestamp': _iso_timestamp(int(time.time()))})
@@ -18,6 +18,29 @@ CREATE TABLE IF NOT EXISTS ventes (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Index unique sur la désignation (users.username est déjà indexé via UNIQUE)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_ventes_design ON ventes(design);
+
+-- Compteur de version des ventes, incrémenté à chaque écriture (ETag de la liste)
+CREATE TABLE IF NOT EXISTS ventes_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO ventes_version (id, version) VALUES (1, 0);
+
+CREATE TRIGGER IF NOT EXISTS ventes_version_insert AFTER INSERT ON ventes
+BEGIN
+    UPDATE ventes_version SET version = version + 1 WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS ventes_version_update AFTER UPDATE ON ventes
+BEGIN
+    UPDATE ventes_version SET version = version + 1 WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS ventes_version_delete AFTER DELETE ON ventes
+BEGIN
+    UPDATE ventes_version SET version = version + 1 WHERE id = 1;
+END;
+
 -- Créer un utilisateur administrateur par défaut (avec mot de passe à changer)
 INSERT OR IGNORE INTO users (username, password, role) 
 VALUES ('admin', 'pbkdf2:sha256:150000$xxxxxxxx$yyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyy', 'admin');
\ No newline at end of file
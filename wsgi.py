@@ -0,0 +1,12 @@
+"""Point d'entrée WSGI pour gunicorn avec des workers gevent.
+
+Lancement :
+    gunicorn -k gevent -w 5 --worker-connections 1000 -b 0.0.0.0:5000 wsgi:app
+"""
+# Le monkey-patching doit précéder l'import de flask/sqlite3 pour rendre
+# les sockets et ssl non bloquants. sqlite3 (module C) n'est pas patché :
+# les transactions doivent rester courtes.
+from gevent import monkey
+monkey.patch_all()
+
+from app import app  # noqa: E402